@@ -10,6 +10,20 @@ from src.user_interactions import (
     get_user_input
 )
 
+# Accepted answers to the continue prompt
+_YES_NO_CHOICES = frozenset({"Y", "N"})
+
+# Menu of operations, printed in a single call on every loop iteration
+MENU_TEXT = (
+    "\nSelect an operation:\n"
+    "1. Calculate Dividend Yield\n"
+    "2. Calculate P/E Ratio\n"
+    "3. Record a Trade\n"
+    "4. Calculate Volume-weighted Stock Price\n"
+    "5. Calculate GBCE All Share Index\n"
+    "6. Exit"
+)
+
 def main():
     # Get stock data from user input
     symbol, stock_type, last_dividend, fixed_dividend, par_value = get_stock_data_from_user()
@@ -29,25 +43,21 @@ def main():
     # Main loop for user interactions
     while True:
         # Display menu options
-        print("\nSelect an operation:")
-        print("1. Calculate Dividend Yield")
-        print("2. Calculate P/E Ratio")
-        print("3. Record a Trade")
-        print("4. Calculate Volume-weighted Stock Price")
-        print("5. Calculate GBCE All Share Index")
-        print("6. Exit")
+        print(MENU_TEXT)
         
         # Get user choice
         choice = get_user_input("\nEnter your choice: ")
 
         # Execute corresponding function based on user choice
-        if choice in menu:
-            menu[choice](stock)
+        handler = menu.get(choice)
+        if handler is not None:
+            handler(stock)
         else:
             print("\nInvalid choice. Please enter a number between 1 and 6.")
 
         # Ask user if they want to continue
-        cont = get_user_input("\nDo you want to continue? (Y/N): ").upper()
+        cont = get_user_input("\nDo you want to continue? (Y/N): ", str.upper, _YES_NO_CHOICES,
+                              "Invalid choice. Please enter Y or N.")
         if cont != "Y":
             break
 
@@ -0,0 +1,64 @@
+"""
+Numeric kernels used by the stock calculations.
+
+The kernels are compiled with Numba when it is installed. Numba is an optional
+dependency: without it the same functions run as NumPy or plain Python code.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _trade_sums(quantities, prices):
+    """
+    Sum the traded value and the traded quantity of a run of trades in a single pass.
+
+    Args:
+        quantities (numpy.ndarray): float64 array of traded quantities.
+        prices (numpy.ndarray): float64 array of trade prices, aligned with quantities.
+
+    Returns:
+        tuple: The total value (sum of price * quantity) and the total quantity.
+    """
+    total_value = 0.0
+    total_quantity = 0.0
+    for i in range(quantities.size):
+        total_value += prices[i] * quantities[i]
+        total_quantity += quantities[i]
+    return total_value, total_quantity
+
+
+def _geo_mean(prices):
+    """
+    Calculate the geometric mean of a non-empty array of positive prices.
+
+    The mean is taken in log space, so it does not overflow for large arrays the
+    way multiplying all the prices together does.
+
+    Args:
+        prices (numpy.ndarray): float64 array of positive prices.
+
+    Returns:
+        float: The geometric mean of the prices.
+    """
+    log_sum = 0.0
+    for i in range(prices.size):
+        log_sum += math.log(prices[i])
+    return math.exp(log_sum / prices.size)
+
+
+if njit is not None:
+    # Compile eagerly against explicit signatures so the first call does not pay for compilation
+    trade_sums_kernel = njit("UniTuple(float64, 2)(float64[:], float64[:])", cache=True, fastmath=True)(_trade_sums)
+    geo_mean_kernel = njit("float64(float64[:])", cache=True, fastmath=True)(_geo_mean)
+else:
+    def trade_sums_kernel(quantities, prices):
+        return float(np.dot(prices, quantities)), float(quantities.sum())
+
+    def geo_mean_kernel(prices):
+        return float(np.exp(np.log(prices).mean()))
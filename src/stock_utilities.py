@@ -1,7 +1,19 @@
+import math
+import time
 from enum import Enum
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from operator import mul
-from functools import reduce
+from typing import Callable, ClassVar
+
+import numpy as np
+
+from src.kernels import trade_sums_kernel, geo_mean_kernel
+
+# Length of the volume-weighted stock price window, in nanoseconds (15 minutes)
+VWAP_WINDOW_NS = 15 * 60 * 10**9
+
+# Initial capacity of the per-stock trade arrays; they double when the live window outgrows them
+_INITIAL_TRADE_CAPACITY = 64
 
 class StockType(Enum):
     COMMON = "COMMON"
@@ -11,71 +23,260 @@ class TradeType(Enum):
     BUY = "BUY"
     SELL = "SELL"
 
+# Trade indicators are stored as int8 codes; the code is the index into this tuple
+_SIDE_ENUM = (TradeType.BUY, TradeType.SELL)
+
+# Valid trade indicators, for a single hash lookup when validating a trade
+_VALID_TRADES = frozenset(TradeType)
+
+
+def _make_dividend_yield(numerator, error):
+    """
+    Build a dividend yield function specialised to one stock's dividend numerator.
+
+    Args:
+        numerator (float or None): last_dividend for Common stocks, fixed_dividend * par_value for Preferred stocks.
+        error (str or None): Validation error for the stock's dividend inputs, raised on every call if set.
+
+    Returns:
+        callable: The dividend yield function for the stock.
+    """
+    if error is not None:
+        def dividend_yield(price):
+            """
+            Reject the call, because the stock's dividend inputs are invalid.
+
+            Args:
+                price (float): The current price of the stock.
+
+            Raises:
+                ValueError: If the price is non-positive, otherwise with the stock's dividend validation error.
+            """
+            if price <= 0:
+                raise ValueError("Price must be positive")
+            raise ValueError(error)
+    else:
+        def dividend_yield(price):
+            """
+            Calculate the dividend yield for the stock.
+
+            Args:
+                price (float): The current price of the stock.
+
+            Returns:
+                float: The calculated dividend yield.
+
+            Raises:
+                ValueError: If the price is non-positive.
+            """
+            if price <= 0:
+                raise ValueError("Price must be positive")
+            return numerator / price
+    return dividend_yield
+
+
+def _make_pe_ratio(dividend_yield, numerator):
+    """
+    Build a P/E ratio function on top of a stock's specialised dividend yield function.
+
+    Args:
+        dividend_yield (callable): The stock's dividend yield function.
+        numerator (float or None): The stock's dividend numerator.
+
+    Returns:
+        callable: The P/E ratio function for the stock.
+    """
+    if numerator == 0:
+        def pe_ratio(price):
+            """
+            Calculate the price-to-earnings (P/E) ratio.
+
+            Args:
+                price (float): The current price of the stock.
+
+            Returns:
+                float or None: The calculated P/E ratio, or None if the dividend is zero.
+            """
+            # The dividend is zero, so the P/E ratio cannot be calculated; still validate the price
+            dividend_yield(price)
+            return None
+    else:
+        def pe_ratio(price):
+            """
+            Calculate the price-to-earnings (P/E) ratio.
+
+            Args:
+                price (float): The current price of the stock.
+
+            Returns:
+                float or None: The calculated P/E ratio, or None if the dividend is zero.
+            """
+            return price / dividend_yield(price)
+    return pe_ratio
+
+
+@dataclass(slots=True, eq=False)
 class StockData:
-    def __init__(self, symbol: str, stock_type: StockType, last_dividend: float, fixed_dividend: float, par_value: float):
-        """
-        Initialize a SimpleData object with the given parameters.
+    """
+    A stock and the trades recorded for it.
 
-        :param symbol: The symbol of the stock.
-        :param stock_type: The type of the stock (COMMON or PREFERRED).
-        :param last_dividend: The last dividend paid by the stock.
-        :param fixed_dividend: The fixed dividend rate for preferred stocks (percentage).
-        :param par_value: The par value of the stock.
-        """
-        self.symbol = symbol
-        self.stock_type = stock_type
-        self.last_dividend = last_dividend
-        self.fixed_dividend = fixed_dividend
-        self.par_value = par_value
-        self.trades = []
-        
-    def dividend_yield(self, price):
+    :param symbol: The symbol of the stock.
+    :param stock_type: The type of the stock (COMMON or PREFERRED).
+    :param last_dividend: The last dividend paid by the stock.
+    :param fixed_dividend: The fixed dividend rate for preferred stocks (percentage).
+    :param par_value: The par value of the stock.
+
+    Reassigning stock_type or a dividend field rebinds dividend_yield and pe_ratio.
+    """
+    symbol: str
+    stock_type: StockType
+    last_dividend: float
+    fixed_dividend: float
+    par_value: float
+
+    # Derived state, set up in __post_init__. slots=True gives the instances a fixed
+    # attribute layout with no per-instance __dict__.
+    _dividend_numerator: float = field(init=False, repr=False)
+    _dividend_error: str = field(init=False, repr=False)
+    dividend_yield: Callable = field(init=False, repr=False)
+    pe_ratio: Callable = field(init=False, repr=False)
+    _ts: np.ndarray = field(init=False, repr=False)
+    _qty: np.ndarray = field(init=False, repr=False)
+    _price: np.ndarray = field(init=False, repr=False)
+    _side: np.ndarray = field(init=False, repr=False)
+    _n: int = field(init=False, repr=False)
+    _head: int = field(init=False, repr=False)
+    _sum_pq: float = field(init=False, repr=False)
+    _sum_q: float = field(init=False, repr=False)
+    last_price: float = field(init=False, repr=False)
+    has_trade: bool = field(init=False, repr=False)
+
+    # Trade timestamps come from the monotonic clock. These readings, taken together,
+    # anchor it to wall-clock time when a trade's datetime is requested.
+    _epoch_wall: ClassVar[datetime] = datetime.now()
+    _epoch_mono: ClassVar[int] = time.monotonic_ns()
+
+    @classmethod
+    def from_row(cls, row):
         """
-        Calculate the dividend yield for the stock.
+        Create a StockData from a row of its fields.
 
         Args:
-            price (float): The current price of the stock.
+            row (tuple): (symbol, stock_type, last_dividend, fixed_dividend, par_value).
 
         Returns:
-            float: The calculated dividend yield.
-            
-        Raises:
-            ValueError: If the price is non-positive, if the last dividend is non-positive,
-                        if the fixed dividend is non-positive for preferred stocks, or if the price is zero.
+            StockData: The new stock.
         """
-        if price <= 0:
-            raise ValueError("Price must be positive")
-        
+        return cls(*row)
+
+    def __post_init__(self):
+        """
+        Validate the dividend inputs and set up the trade storage of a new stock.
+        """
+        self._bind_dividend()
+
+        # Trades are stored as parallel arrays (timestamp, quantity, price, side) rather
+        # than a list of dicts, so the VWAP can be computed with vectorised NumPy calls
+        self._ts = np.empty(_INITIAL_TRADE_CAPACITY, dtype=np.int64)
+        self._qty = np.empty(_INITIAL_TRADE_CAPACITY, dtype=np.float64)
+        self._price = np.empty(_INITIAL_TRADE_CAPACITY, dtype=np.float64)
+        self._side = np.empty(_INITIAL_TRADE_CAPACITY, dtype=np.int8)
+        self._n = 0
+
+        # Running totals over the trades in the 15-minute window, which spans indices
+        # [_head, _n). Expired trades are subtracted as the window slides forward.
+        self._head = 0
+        self._sum_pq = 0.0
+        self._sum_q = 0.0
+
+        # Price of the most recent trade, read by the GBCE All Share Index
+        self.last_price = math.nan
+        self.has_trade = False
+
+    def _bind_dividend(self):
+        """
+        Validate the dividend inputs and bind the dividend yield and P/E ratio functions to them.
+
+        Called on construction and again whenever a dividend input is changed.
+        """
+        # The dividend yield numerator does not depend on the price, so validate the
+        # dividend inputs and resolve it once here. Invalid inputs are reported when
+        # the dividend yield is requested.
+        self._dividend_numerator = None
+        self._dividend_error = None
         if self.stock_type == StockType.COMMON:
             if self.last_dividend is None or self.last_dividend < 0:
-                raise ValueError("Last dividend must be provided and be positive for Common stocks")
-            return self.last_dividend / price
-        
+                self._dividend_error = "Last dividend must be provided and be positive for Common stocks"
+            else:
+                self._dividend_numerator = self.last_dividend
         elif self.stock_type == StockType.PREFERRED:
             if self.fixed_dividend is None or self.fixed_dividend <= 0:
-                raise ValueError("Fixed dividend must be provided and to be positive for Preferred stocks")
-            return (self.fixed_dividend * self.par_value) / price
+                self._dividend_error = "Fixed dividend must be provided and to be positive for Preferred stocks"
+            elif self.par_value is None or self.par_value <= 0:
+                self._dividend_error = "Par value must be provided and be positive for Preferred stocks"
+            else:
+                self._dividend_numerator = self.fixed_dividend * self.par_value
+        else:
+            self._dividend_error = "Invalid stock type"
+
+        # Bind dividend_yield and pe_ratio specialised to this stock, so calls skip the
+        # stock type dispatch and dividend validation
+        self.dividend_yield = _make_dividend_yield(self._dividend_numerator, self._dividend_error)
+        self.pe_ratio = _make_pe_ratio(self.dividend_yield, self._dividend_numerator)
 
-    def pe_ratio(self, price):
+    @property
+    def trades(self):
+        """
+        Read-only view of the recorded trades, oldest first.
+
+        Returns:
+            TradeView: A sequence of Trade records, indexable by 'timestamp', 'quantity', 'price' and 'indicator'.
+                       Slicing it returns a list of Trade records. Quantities are floats.
+                       Trades older than 15 minutes may already have been discarded.
         """
-        Calculate the price-to-earnings (P/E) ratio.
+        return TradeView(self)
+
+    def dividend_yield_batch(self, prices):
+        """
+        Calculate the dividend yield for the stock at each of an array of prices.
 
         Args:
-            price (float): The current price of the stock.
+            prices (numpy.ndarray): The prices of the stock.
 
         Returns:
-            float or None: The calculated P/E ratio, or None if the dividend is zero.
+            numpy.ndarray: The calculated dividend yields, one per price.
+
+        Raises:
+            ValueError: If any price is non-positive, or if the dividend inputs of the stock are invalid.
         """
-        # Calculate dividend yield
-        dividend = self.dividend_yield(price)
-        
-        # Return None if the dividend is zero, indicating that the P/E ratio cannot be calculated
-        if dividend == 0:
-            return None
-        
-        # Calculate and return P/E ratio
-        return price / dividend
+        prices = np.asarray(prices, dtype=np.float64)
+        if np.any(prices <= 0):
+            raise ValueError("Price must be positive")
 
+        if self._dividend_error is not None:
+            raise ValueError(self._dividend_error)
+        return np.divide(self._dividend_numerator, prices)
+
+    def pe_ratio_batch(self, prices):
+        """
+        Calculate the price-to-earnings (P/E) ratio at each of an array of prices.
+
+        Args:
+            prices (numpy.ndarray): The prices of the stock.
+
+        Returns:
+            numpy.ndarray: The calculated P/E ratios, or NaN where the dividend is zero.
+
+        Raises:
+            ValueError: If any price is non-positive, or if the dividend inputs of the stock are invalid.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        dividends = self.dividend_yield_batch(prices)
+
+        # The P/E ratio cannot be calculated when the dividend is zero
+        if self._dividend_numerator == 0:
+            return np.full(prices.shape, np.nan)
+        return prices / dividends
 
     def record_trade(self, quantity: int, price: float, indicator: TradeType):
         """
@@ -89,15 +290,214 @@ class StockData:
         Returns:
             None
         """
-        if quantity <= 0:
-            raise ValueError("Quantity must be positive")
-        if price <= 0:
-            raise ValueError("Price must be positive")
-        if indicator not in TradeType:
+        # Non-finite values would poison the running VWAP totals until the window empties
+        if not math.isfinite(quantity) or quantity <= 0:
+            raise ValueError("Quantity must be positive and finite")
+        if not math.isfinite(price) or price <= 0:
+            raise ValueError("Price must be positive and finite")
+        try:
+            valid_indicator = indicator in _VALID_TRADES
+        except TypeError:
+            # Unhashable values such as lists cannot be trade indicators
+            valid_indicator = False
+        if not valid_indicator:
+            raise ValueError("Invalid trade indicator")
+
+        # Slide the window first, so that making room can discard the expired trades
+        now = time.monotonic_ns()
+        self._evict(now - VWAP_WINDOW_NS)
+        self._reserve(1)
+
+        n = self._n
+        self._ts[n] = now
+        self._qty[n] = quantity
+        self._price[n] = price
+        self._side[n] = 0 if indicator is TradeType.BUY else 1
+        self._n = n + 1
+
+        self.last_price = price
+        self.has_trade = True
+
+        self._sum_pq += price * quantity
+        self._sum_q += quantity
+
+    def record_trades(self, timestamps, quantities, prices, sides):
+        """
+        Record a batch of trades for the stock, e.g. when replaying historical ticks.
+
+        Args:
+            timestamps (numpy.ndarray): int64 trade times in nanoseconds from time.monotonic_ns(), in non-decreasing
+                                        order, no earlier than the last recorded trade and not in the future.
+            quantities (numpy.ndarray): The quantities of shares traded.
+            prices (numpy.ndarray): The prices at which the trades occurred.
+            sides (numpy.ndarray): int8 trade indicators, 0 for BUY and 1 for SELL.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the arrays are not one-dimensional or differ in length, if the timestamps are not integers,
+                        are out of order or are in the future, if any quantity or price is non-positive or non-finite,
+                        or if any side is not an integer 0 or 1.
+        """
+        # Convert without a dtype, so the checks below see the values as given rather
+        # than wrapped or truncated by a cast
+        timestamps = np.asarray(timestamps)
+        quantities = np.asarray(quantities)
+        prices = np.asarray(prices)
+        sides = np.asarray(sides)
+
+        if not timestamps.ndim == quantities.ndim == prices.ndim == sides.ndim == 1:
+            raise ValueError("Trade arrays must be one-dimensional")
+        count = timestamps.size
+        if not quantities.size == prices.size == sides.size == count:
+            raise ValueError("Trade arrays must have the same length")
+        if count == 0:
+            return
+        if not np.issubdtype(timestamps.dtype, np.integer):
+            raise ValueError("Trade timestamps must be integer nanoseconds")
+        if not np.issubdtype(sides.dtype, np.integer) or np.any((sides != 0) & (sides != 1)):
             raise ValueError("Invalid trade indicator")
+        timestamps = timestamps.astype(np.int64, copy=False)
+        quantities = quantities.astype(np.float64, copy=False)
+        prices = prices.astype(np.float64, copy=False)
+        sides = sides.astype(np.int8, copy=False)
+
+        if np.any(timestamps[1:] < timestamps[:-1]) or (self._n and timestamps[0] < self._ts[self._n - 1]):
+            raise ValueError("Trade timestamps must be in time order")
+
+        # A future timestamp would sort after trades recorded later with record_trade
+        now = time.monotonic_ns()
+        if timestamps[-1] > now:
+            raise ValueError("Trade timestamps must not be in the future")
+        if not np.all(np.isfinite(quantities) & (quantities > 0)):
+            raise ValueError("Quantity must be positive and finite")
+        if not np.all(np.isfinite(prices) & (prices > 0)):
+            raise ValueError("Price must be positive and finite")
+
+        cutoff = now - VWAP_WINDOW_NS
+        self._evict(cutoff)
+
+        # Make room for the whole batch, then copy each field in one slice assignment
+        self._reserve(count)
+        n = self._n
+        new_n = n + count
+
+        self._ts[n:new_n] = timestamps
+        self._qty[n:new_n] = quantities
+        self._price[n:new_n] = prices
+        self._side[n:new_n] = sides
+        self._n = new_n
+
+        self.last_price = float(prices[-1])
+        self.has_trade = True
+
+        # If the window was empty, it starts at the first batch trade inside it;
+        # otherwise the whole batch is newer than trades already in the window
+        if self._head == n:
+            self._head = n + int(np.searchsorted(timestamps, cutoff))
+        start = max(self._head, n)
+        value, quantity = trade_sums_kernel(self._qty[start:new_n], self._price[start:new_n])
+        self._sum_pq += value
+        self._sum_q += quantity
+
+    def set_trades_bulk(self, timestamps, quantities, prices, sides):
+        """
+        Replace all recorded trades with the given arrays.
+
+        Args:
+            timestamps (numpy.ndarray): int64 trade times in nanoseconds from time.monotonic_ns(), in non-decreasing
+                                        order and not in the future.
+            quantities (numpy.ndarray): The quantities of shares traded.
+            prices (numpy.ndarray): The prices at which the trades occurred.
+            sides (numpy.ndarray): int8 trade indicators, 0 for BUY and 1 for SELL.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the trades are invalid, as for record_trades.
+        """
+        self.clear_trades()
+        self.record_trades(timestamps, quantities, prices, sides)
+
+    def clear_trades(self):
+        """
+        Remove all recorded trades, keeping the allocated trade arrays for reuse.
+
+        Returns:
+            None
+        """
+        self._n = 0
+        self._head = 0
+        self._sum_pq = 0.0
+        self._sum_q = 0.0
+        self.last_price = math.nan
+        self.has_trade = False
+
+    def _reserve(self, count):
+        """
+        Make room to append the given number of trades.
+
+        The trade arrays act as a buffer over the 15-minute window: when they are full,
+        trades that have left the window are discarded and the live window is moved to
+        the front and its running totals are re-summed. The arrays are only
+        reallocated, doubling in size, when the window itself needs more than half of
+        them. Memory therefore follows the number of trades in the window rather than
+        the total ever recorded, and appends stay amortised O(1).
+
+        Args:
+            count (int): The number of trades about to be appended.
+        """
+        head, n = self._head, self._n
+        capacity = self._ts.size
+        if n + count <= capacity:
+            return
+
+        live = n - head
+        required = live + count
+        new_capacity = capacity
+        while new_capacity < 2 * required:
+            new_capacity *= 2
+
+        for name in ('_ts', '_qty', '_price', '_side'):
+            old = getattr(self, name)
+            if new_capacity == capacity:
+                old[:live] = old[head:n]
+            else:
+                new = np.empty(new_capacity, dtype=old.dtype)
+                new[:live] = old[head:n]
+                setattr(self, name, new)
+        self._head = 0
+        self._n = live
+
+        # The live window was just copied, so re-sum it to drop the rounding error the
+        # running totals have picked up from subtracting expired trades
+        self._sum_pq, self._sum_q = trade_sums_kernel(self._qty[:live], self._price[:live])
+
+    def _evict(self, cutoff):
+        """
+        Slide the window start past trades older than the cutoff, removing them from the running totals.
+
+        Args:
+            cutoff (int): Timestamp in nanoseconds; trades strictly before it fall out of the window.
+        """
+        head, n = self._head, self._n
+        if head == n or self._ts[head] >= cutoff:
+            return
 
-        timestamp = datetime.now()
-        self.trades.append({'timestamp': timestamp, 'quantity': quantity, 'price': price, 'indicator': indicator})
+        # Timestamps are sorted, so binary search for the new window start and
+        # subtract the expired slice in one pass
+        start = head + int(np.searchsorted(self._ts[head:n], cutoff))
+        expired_value, expired_quantity = trade_sums_kernel(self._qty[head:start], self._price[head:start])
+        if expired_value > 0.5 * self._sum_pq or expired_quantity > 0.5 * self._sum_q:
+            # Subtracting most of the totals would cancel away their precision, so
+            # re-sum the trades left in the window instead (zero once it is empty)
+            self._sum_pq, self._sum_q = trade_sums_kernel(self._qty[start:n], self._price[start:n])
+        else:
+            self._sum_pq -= expired_value
+            self._sum_q -= expired_quantity
+        self._head = start
 
     def volume_weighted_stock_price(self):
         """
@@ -106,22 +506,195 @@ class StockData:
         Returns:
             float or None: The volume-weighted stock price, or None if there are no trades within the last 15 minutes.
         """
-        # Calculate the timestamp 15 minutes ago
-        fifteen_minutes_ago = datetime.now() - timedelta(minutes=15)
-
-        # Filter trades within the last 15 minutes
-        trades_within_15_minutes = [trade for trade in self.trades if trade['timestamp'] >= fifteen_minutes_ago]
+        # Drop trades older than 15 minutes from the running totals
+        self._evict(time.monotonic_ns() - VWAP_WINDOW_NS)
 
         # If no trades within the last 15 minutes, return None
-        if not trades_within_15_minutes:
+        if self._head == self._n:
             return None
 
-        # Calculate total value and total quantity for volume-weighted stock price
-        total_value = sum(trade['price'] * trade['quantity'] for trade in trades_within_15_minutes)
-        total_quantity = sum(trade['quantity'] for trade in trades_within_15_minutes)
-
         # Calculate volume-weighted stock price
-        return total_value / total_quantity
+        return float(self._sum_pq / self._sum_q)
+
+
+def _rebinding_field(slot):
+    """
+    Wrap a StockData slot so that assigning to it rebinds the stock's dividend functions.
+
+    Args:
+        slot (member_descriptor): The slot descriptor generated for the field.
+
+    Returns:
+        property: A property that reads and writes the slot.
+    """
+    def fset(self, value):
+        slot.__set__(self, value)
+        # The dataclass __init__ assigns every field before __post_init__ binds the functions
+        if hasattr(self, 'pe_ratio'):
+            self._bind_dividend()
+    return property(slot.__get__, fset)
+
+
+# The dividend functions are specialised to these fields, so keep them in step when one is
+# reassigned. Only these fields pay for the property; the trade state stays plain slots.
+for _name in ('stock_type', 'last_dividend', 'fixed_dividend', 'par_value'):
+    setattr(StockData, _name, _rebinding_field(getattr(StockData, _name)))
+del _name
+
+
+class Trade:
+    """
+    A single recorded trade. Fields can also be read by key, as in trade['price'].
+
+    The quantity is a float, even when it was recorded as an int, because trades are
+    stored in float64 arrays.
+    """
+
+    __slots__ = ("ts_ns", "quantity", "price", "indicator")
+
+    _FIELDS = ("timestamp", "quantity", "price", "indicator")
+
+    def __init__(self, ts_ns, quantity, price, indicator):
+        self.ts_ns = ts_ns
+        self.quantity = quantity
+        self.price = price
+        self.indicator = indicator
+
+    @property
+    def timestamp(self):
+        """
+        The wall-clock time of the trade, derived from its monotonic timestamp on access.
+
+        Returns:
+            datetime: The time at which the trade was recorded.
+        """
+        return StockData._epoch_wall + timedelta(microseconds=(self.ts_ns - StockData._epoch_mono) // 1000)
+
+    def __getitem__(self, key):
+        if key not in Trade._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"Trade(timestamp={self.timestamp!r}, quantity={self.quantity!r}, price={self.price!r}, indicator={self.indicator!r})"
+
+
+class TradeView:
+    """
+    Sequence view over the trade arrays of a StockData, exposing each trade as a Trade record.
+    """
+
+    __slots__ = ("_stock",)
+
+    def __init__(self, stock):
+        self._stock = stock
+
+    def __len__(self):
+        return self._stock._n
+
+    def __getitem__(self, index):
+        stock = self._stock
+        n = stock._n
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(n))]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("trade index out of range")
+        return Trade(
+            int(stock._ts[index]),
+            stock._qty[index].item(),
+            stock._price[index].item(),
+            _SIDE_ENUM[stock._side[index]],
+        )
+
+
+# Per-stock fields of a StockUniverse record array; missing dividends are stored as NaN
+_UNIVERSE_DTYPE = np.dtype([('last_div', 'f8'), ('fixed_div', 'f8'), ('par', 'f8'), ('type', 'u1')])
+
+# Stock type codes stored in the 'type' field of a StockUniverse
+_STOCK_TYPE_CODES = {StockType.COMMON: 0, StockType.PREFERRED: 1}
+
+# Type code of stocks whose stock type is invalid; their dividend yield is NaN
+_INVALID_STOCK_TYPE_CODE = 255
+
+
+class StockUniverse:
+    """
+    A set of stocks whose dividend fields are held in one NumPy record array, so that
+    indicators can be calculated for the whole market in a single vectorised expression.
+    """
+
+    def __init__(self, stocks):
+        """
+        Initialize a StockUniverse from the given stocks.
+
+        :param stocks: The StockData objects in the universe, in index order.
+
+        The records array is a snapshot of the stocks' dividend fields taken here; it is
+        not updated if a stock is changed afterwards.
+        """
+        self.stocks = list(stocks)
+        self.index = {stock.symbol: i for i, stock in enumerate(self.stocks)}
+
+        # Build the record array in a single allocation
+        self.records = np.array([
+            (
+                math.nan if stock.last_dividend is None else stock.last_dividend,
+                math.nan if stock.fixed_dividend is None else stock.fixed_dividend,
+                math.nan if stock.par_value is None else stock.par_value,
+                _STOCK_TYPE_CODES.get(stock.stock_type, _INVALID_STOCK_TYPE_CODE),
+            )
+            for stock in self.stocks
+        ], dtype=_UNIVERSE_DTYPE).view(np.recarray)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Create a StockUniverse from rows of stock fields.
+
+        Args:
+            rows (iterable): (symbol, stock_type, last_dividend, fixed_dividend, par_value) tuples.
+
+        Returns:
+            StockUniverse: The universe of the new stocks, in row order.
+        """
+        return cls(StockData.from_row(row) for row in rows)
+
+    def __len__(self):
+        return len(self.stocks)
+
+    def __getitem__(self, symbol):
+        return self.stocks[self.index[symbol]]
+
+    def dividend_yield(self, prices):
+        """
+        Calculate the dividend yield of every stock in the universe.
+
+        Args:
+            prices (numpy.ndarray): The current price of each stock, in index order.
+
+        Returns:
+            numpy.ndarray: The calculated dividend yields, or NaN for stocks whose dividend inputs are invalid.
+
+        Raises:
+            ValueError: If the number of prices does not match the number of stocks, or if any price is non-positive.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape != (len(self.stocks),):
+            raise ValueError("Expected one price per stock")
+        if np.any(prices <= 0):
+            raise ValueError("Price must be positive")
+
+        records = self.records
+        preferred = records.type == _STOCK_TYPE_CODES[StockType.PREFERRED]
+        numerators = np.where(preferred, records.fixed_div * records.par, records.last_div)
+
+        # Invalid dividend inputs give NaN, where StockData.dividend_yield raises ValueError
+        invalid = np.where(preferred, ~((records.fixed_div > 0) & (records.par > 0)), ~(records.last_div >= 0))
+        invalid |= records.type == _INVALID_STOCK_TYPE_CODE
+        numerators[invalid] = np.nan
+        return numerators / prices
 
 
 class GBCECalculator:
@@ -139,15 +712,28 @@ class GBCECalculator:
         if not stock_data:
             return None  # Handle case when stock_data is empty
 
-        # Filter out stocks without any trades
-        valid_stocks = [stock for stock in stock_data if stock.trades]
+        # Assemble the last traded prices and the stocks with trades once, then index in bulk
+        count = len(stock_data)
+        last_prices = np.fromiter((stock.last_price for stock in stock_data), dtype=np.float64, count=count)
+        valid_mask = np.fromiter((stock.has_trade for stock in stock_data), dtype=np.bool_, count=count)
+        return GBCECalculator.calculate_gbce_all_share_index_batch(last_prices, valid_mask)
 
-        if not valid_stocks:
-            return None  # Handle case when all stocks have no trades
+    @staticmethod
+    def calculate_gbce_all_share_index_batch(last_prices, valid_mask):
+        """
+        Calculate the GBCE All Share Index from preassembled arrays of last prices.
 
-        # Calculate the product of prices for valid stocks
-        prices = [stock.trades[-1]['price'] for stock in valid_stocks]
-        product = reduce(mul, prices, 1)
+        Args:
+            last_prices (numpy.ndarray): float64 array of the last traded price of each stock.
+            valid_mask (numpy.ndarray): Boolean array, True for the stocks that have trades.
+
+        Returns:
+            float or None: The calculated GBCE All Share Index, or None if no stock is valid.
+        """
+        prices = last_prices[valid_mask]
+
+        if not prices.size:
+            return None  # Handle case when all stocks have no trades
 
         # Calculate the geometric mean of prices for all valid stocks
-        return (product) ** (1.0 / len(valid_stocks))
\ No newline at end of file
+        return geo_mean_kernel(prices)
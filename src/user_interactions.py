@@ -1,26 +1,60 @@
 import os
+import re
 import logging
 from src.stock_utilities import StockType, TradeType, GBCECalculator
 
-# Configure logging
+# Logging is configured on first use, so importing this module does not touch the disk
 logs_directory='logs'
-os.makedirs(logs_directory, exist_ok=True)
 log_file_path = os.path.join(logs_directory, 'user_interaction.log')
-logging.basicConfig(filename=log_file_path, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+_logger = None
 
-def get_user_input(prompt):
+def _get_logger():
+    """
+    Get the interaction logger, creating the log directory and file handler on first use.
+
+    Returns:
+        logging.Logger: The logger writing to the user interaction log file.
+    """
+    global _logger
+    if _logger is None:
+        os.makedirs(logs_directory, exist_ok=True)
+        handler = logging.FileHandler(log_file_path)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        logger.propagate = False
+        _logger = logger
+    return _logger
+
+# Plain decimal numbers, the common case for numeric prompts, parsed without try/except
+_NUM_RE = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
+
+# Accepted answers for the choice prompts
+_STOCK_TYPE_CHOICES = frozenset({"COMMON", "PREFERRED"})
+_TRADE_INDICATOR_CHOICES = frozenset({"BUY", "SELL"})
+
+def get_user_input(prompt, normalize=None, choices=None, invalid_message=None):
     """
     Get user input with a prompt and log the input.
     
     Args:
         prompt (str): The prompt message for user input.
+        normalize (callable, optional): Applied to the stripped input, e.g. str.upper.
+        choices (frozenset, optional): Accepted answers; the user is prompted again until the input is one of them.
+        invalid_message (str, optional): Message printed when the input is not one of the choices.
     
     Returns:
         str: The user input.
     """
-    user_input = input(prompt).strip()
-    logging.info(f"User input: {prompt.strip()} - {user_input}")
-    return user_input
+    while True:
+        user_input = input(prompt).strip()
+        if normalize is not None:
+            user_input = normalize(user_input)
+        _get_logger().info("User input: %s - %s", prompt.strip(), user_input)
+        if choices is None or user_input in choices:
+            return user_input
+        print(invalid_message or "Invalid input.")
 
 def get_float_input(prompt):
     """
@@ -34,6 +68,9 @@ def get_float_input(prompt):
     """
     while True:
         user_input = get_user_input(prompt)
+        if _NUM_RE.fullmatch(user_input):
+            return float(user_input)
+        # Fall back to float() for the other spellings it accepts, e.g. "inf" or "1_000"
         try:
             return float(user_input)
         except ValueError:
@@ -47,10 +84,8 @@ def get_stock_data_from_user():
         tuple: A tuple containing symbol, stock_type, last_dividend, fixed_dividend, and par_value.
     """
     symbol = get_user_input("Enter the symbol of the stock: ")
-    stock_type_input = get_user_input("Enter the type of the stock (COMMON/PREFERRED): ").upper()
-    while stock_type_input not in ["COMMON", "PREFERRED"]:
-        print("Invalid stock type. Please enter COMMON or PREFERRED.")
-        stock_type_input = get_user_input("Enter the type of the stock (COMMON/PREFERRED): ").upper()
+    stock_type_input = get_user_input("Enter the type of the stock (COMMON/PREFERRED): ", str.upper, _STOCK_TYPE_CHOICES,
+                                      "Invalid stock type. Please enter COMMON or PREFERRED.")
     stock_type = StockType[stock_type_input]
     
     # Validate last dividend for common stock or fixed dividend for preferred stock
@@ -86,13 +121,13 @@ def dividend_yield_interaction(stock):
     """
     try:
         price = get_float_input("Enter the current price of the stock: ")
-        logging.info(f"User input - Operation: Calculate Dividend Yield - Price: {price}")
+        _get_logger().info("User input - Operation: Calculate Dividend Yield - Price: %s", price)
         result = stock.dividend_yield(price)
         print("\nDividend Yield:", result)
-        logging.info(f"Calculation Result - Dividend Yield: {result}")
+        _get_logger().info("Calculation Result - Dividend Yield: %s", result)
     except ValueError  as e:
         print("\nError:", e)
-        logging.error(f"Error: {e}")
+        _get_logger().error("Error: %s", e)
 
 def pe_ratio_interaction(stock):
     """
@@ -103,17 +138,17 @@ def pe_ratio_interaction(stock):
     """
     try:
         price = get_float_input("Enter the current price of the stock: ")
-        logging.info(f"User input - Operation: Calculate P/E Ratio - Price: {price}")
+        _get_logger().info("User input - Operation: Calculate P/E Ratio - Price: %s", price)
         result = stock.pe_ratio(price)
         if result is not None:
             print("\nP/E Ratio:", result)
-            logging.info(f"Calculation Result - P/E Ratio: {result}")
+            _get_logger().info("Calculation Result - P/E Ratio: %s", result)
         else:
             print("\nP/E Ratio cannot be calculated because dividend is zero.")
-            logging.info("Calculation Result - P/E Ratio cannot be calculated because dividend is zero.")
+            _get_logger().info("Calculation Result - P/E Ratio cannot be calculated because dividend is zero.")
     except ValueError  as e:
         print("\nError:", e)
-        logging.error(f"Error: {e}")
+        _get_logger().error("Error: %s", e)
 
 def record_trade_interaction(stock):
     """
@@ -125,18 +160,16 @@ def record_trade_interaction(stock):
     try:
         quantity = int(get_user_input("Enter the quantity of shares traded: "))
         price = get_float_input("Enter the price at which the trade occurred: ")
-        indicator_input = get_user_input("Enter whether the trade is a buy or sell (BUY/SELL): ").upper()
-        while indicator_input not in ["BUY", "SELL"]:
-            print("Invalid trade indicator. Please enter BUY or SELL.")
-            indicator_input = get_user_input("Enter whether the trade is a buy or sell (BUY/SELL): ").upper()
+        indicator_input = get_user_input("Enter whether the trade is a buy or sell (BUY/SELL): ", str.upper, _TRADE_INDICATOR_CHOICES,
+                                         "Invalid trade indicator. Please enter BUY or SELL.")
         indicator = TradeType[indicator_input]
         stock.record_trade(quantity, price, indicator)
         print("\nTrade recorded successfully")
-        logging.info(f"User input - Operation: Record Trade - Quantity: {quantity}, Price: {price}, Indicator: {indicator}")
-        logging.info("Trade recorded successfully")
+        _get_logger().info("User input - Operation: Record Trade - Quantity: %s, Price: %s, Indicator: %s", quantity, price, indicator)
+        _get_logger().info("Trade recorded successfully")
     except ValueError  as e:
         print("\nError:", e)
-        logging.error(f"Error: {e}")
+        _get_logger().error("Error: %s", e)
 
 def volume_weighted_stock_price_interaction(stock):
     """
@@ -148,17 +181,17 @@ def volume_weighted_stock_price_interaction(stock):
     result = stock.volume_weighted_stock_price()
     if result is not None:
         print("\nVolume-weighted Stock Price:", result)
-        logging.info(f"Calculation Result - Volume-weighted Stock Price: {result}")
+        _get_logger().info("Calculation Result - Volume-weighted Stock Price: %s", result)
     else:
         print("\nNo trades within the last 15 minutes.")
-        logging.info("No trades within the last 15 minutes.")
+        _get_logger().info("No trades within the last 15 minutes.")
 
 def gbce_all_share_index_interaction(stock):
     result = GBCECalculator.calculate_gbce_all_share_index([stock])
     if result is not None:
         print("\nGBCE All Share Index:", result)
-        logging.info(f"Calculation Result - GBCE All Share Index: {result}")
+        _get_logger().info("Calculation Result - GBCE All Share Index: %s", result)
     else:
         print("\nNo valid stocks with trades.")
-        logging.info("No valid stocks with trades.")
+        _get_logger().info("No valid stocks with trades.")
 
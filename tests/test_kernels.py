@@ -0,0 +1,44 @@
+import importlib.util
+import unittest
+import numpy as np
+from src import kernels
+
+_HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+class TestKernels(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Random trades, shared by every kernel comparison
+        rng = np.random.default_rng(2)
+        cls.quantities = rng.integers(1, 1000, 1001).astype(np.float64)
+        cls.prices = rng.uniform(1.0, 500.0, 1001)
+
+    def reference_sums(self, quantities, prices):
+        return np.dot(prices, quantities), quantities.sum()
+
+    def test_trade_sums_python(self):
+        # The pure-Python body that Numba compiles
+        actual = kernels._trade_sums(self.quantities, self.prices)
+        np.testing.assert_allclose(actual, self.reference_sums(self.quantities, self.prices), rtol=1e-12)
+        self.assertEqual(kernels._trade_sums(self.quantities[:0], self.prices[:0]), (0.0, 0.0))
+
+    def test_geo_mean_python(self):
+        self.assertAlmostEqual(kernels._geo_mean(np.array([100.0, 400.0])), 200.0)
+        np.testing.assert_allclose(kernels._geo_mean(self.prices), np.exp(np.log(self.prices).mean()), rtol=1e-12)
+
+    @unittest.skipUnless(_HAS_NUMBA, "numba is not installed")
+    def test_compiled_kernels_match_reference(self):
+        # The module kernels are the Numba-compiled functions when numba is installed
+        self.assertTrue(hasattr(kernels.trade_sums_kernel, "signatures"))
+        self.assertTrue(hasattr(kernels.geo_mean_kernel, "signatures"))
+
+        # Contiguous slices, as the trade window passes them, and strided ones
+        for quantities, prices in ((self.quantities, self.prices), (self.quantities[10:500], self.prices[10:500]),
+                                   (self.quantities[::3], self.prices[::3]), (self.quantities[:0], self.prices[:0])):
+            with self.subTest(size=quantities.size):
+                np.testing.assert_allclose(kernels.trade_sums_kernel(quantities, prices),
+                                           self.reference_sums(quantities, prices), rtol=1e-12)
+        for prices in (self.prices, self.prices[5:50], self.prices[::7]):
+            with self.subTest(size=prices.size):
+                np.testing.assert_allclose(kernels.geo_mean_kernel(prices), np.exp(np.log(prices).mean()), rtol=1e-12)
@@ -1,35 +1,93 @@
 import os
-import sys
-# Get the path to the parent directory of the current directory (tests directory)
-current_dir = os.path.dirname(__file__)
-parent_dir = os.path.abspath(os.path.join(current_dir, os.pardir))
-
-# Add the parent directory (project root) to the sys.path
-sys.path.append(parent_dir)
-
+import time
+import timeit
 import unittest
+import numpy as np
 from datetime import datetime
-from src.stock_utilities import StockData, StockType, TradeType
-from datetime import datetime, timedelta
+from src.stock_utilities import StockData, StockType, TradeType, GBCECalculator, StockUniverse
+
+# Wall-clock bounds flake on loaded machines, so the timing tests only run when asked for
+_PERF_TESTS = os.environ.get("STOCK_PERF_TESTS") == "1"
+
+# (symbol, stock_type, last_dividend, fixed_dividend, par_value) of the fixture stocks
+_FIXTURE_ROWS = (
+    ("TEA", StockType.COMMON, 0.0, None, 100.0),
+    ("POP", StockType.COMMON, 8.0, None, 100.0),
+    ("ALE", StockType.COMMON, 23.0, None, 60.0),
+    ("GIN", StockType.PREFERRED, 8.0, 0.02, 100.0),
+    ("JOE", StockType.COMMON, 13.0, None, 250.0),
+    ("XYZ", StockType.PREFERRED, 8.0, None, 100.0),
+    ("ABC", StockType.COMMON, 10.0, None, 100.0),
+)
 
 
 class TestStockData(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Shared fixtures, built once for the whole class
+        stocks = {row[0]: StockData.from_row(row) for row in _FIXTURE_ROWS}
+        cls.tea_stock = stocks["TEA"]
+        cls.pop_stock = stocks["POP"]
+        cls.ale_stock = stocks["ALE"]
+        cls.gin_stock = stocks["GIN"]
+        cls.joe_stock = stocks["JOE"]
+        cls.preferred_stock_no_dividend = stocks["XYZ"]
+
+        # (stock, price, expected) rows for the table-driven tests
+        cls.DIV_YIELD_CASES = (
+            (cls.tea_stock, 10, 0.0),
+            (cls.tea_stock, 100, 0.0),  # TEA (price doesn't affect dividend yield)
+            (cls.pop_stock, 100, 0.08),
+            (cls.ale_stock, 100, 0.23),
+            (cls.joe_stock, 100, 0.13),
+        )
+        cls.PE_RATIO_CASES = (
+            (cls.pop_stock, 100, 1250),  # P/E ratio = Price / Dividend
+            (cls.ale_stock, 100, 100 / 0.23),
+            (cls.gin_stock, 100, 100 / 0.02),
+        )
+
     def setUp(self):
-        self.tea_stock = StockData("TEA", StockType.COMMON, 0.0, None, 100.0)
-        self.pop_stock = StockData("POP", StockType.COMMON, 8.0, None, 100.0)
-        self.ale_stock = StockData("ALE", StockType.COMMON, 23.0, None, 60.0)
-        self.gin_stock = StockData("GIN", StockType.PREFERRED, 8.0, 0.02, 100.0)
-        self.joe_stock = StockData("JOE", StockType.COMMON, 13.0, None, 250.0)
-        self.preferred_stock_no_dividend = StockData("XYZ", StockType.PREFERRED, 8.0, None, 100.0)
-        self.stock = StockData("ABC", StockType.COMMON, 10.0, None, 100.0)
+        # Fresh stock for the tests that record trades on it
+        self.stock = StockData.from_row(_FIXTURE_ROWS[-1])  # ABC
+
+    def tearDown(self):
+        # Some tests record trades on the shared fixtures; reset them for the next test
+        for stock in (self.tea_stock, self.pop_stock, self.ale_stock, self.gin_stock, self.joe_stock,
+                      self.preferred_stock_no_dividend):
+            stock.clear_trades()
 
     def test_dividend_yield_common_stock(self):
-        # Test dividend yield for common stocks with last dividend
-        self.assertAlmostEqual(self.tea_stock.dividend_yield(10), 0.0)  # TEA
-        self.assertAlmostEqual(self.tea_stock.dividend_yield(100), 0.0)  # TEA (price doesn't affect dividend yield)
-        self.assertAlmostEqual(self.pop_stock.dividend_yield(100), 0.08) 
-        self.assertAlmostEqual(self.ale_stock.dividend_yield(100), 0.23) 
-        self.assertAlmostEqual(self.joe_stock.dividend_yield(100), 0.13) 
+        # Test dividend yield for common stocks with last dividend, in one comparison
+        actual = np.array([stock.dividend_yield(price) for stock, price, _ in self.DIV_YIELD_CASES])
+        expected = np.array([expected for _, _, expected in self.DIV_YIELD_CASES])
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=5e-8)
+
+    def test_dividend_yield_batch(self):
+        # Test dividend yield over an array of prices
+        np.testing.assert_allclose(self.pop_stock.dividend_yield_batch(np.array([100., 100., 100.])), [0.08, 0.08, 0.08])
+        np.testing.assert_allclose(self.gin_stock.dividend_yield_batch(np.array([50., 100.])), [0.04, 0.02])
+        with self.assertRaises(ValueError):
+            self.pop_stock.dividend_yield_batch(np.array([100., 0.]))
+        with self.assertRaises(ValueError):
+            self.preferred_stock_no_dividend.dividend_yield_batch(np.array([100.]))
+
+    def test_stock_universe_dividend_yield(self):
+        # Test dividend yield across all fixture stocks in one vectorised call
+        universe = StockUniverse.from_rows(_FIXTURE_ROWS)
+        self.assertEqual(len(universe), 7)
+        self.assertEqual(universe["GIN"].fixed_dividend, 0.02)
+        result = universe.dividend_yield(np.full(7, 100.))
+        np.testing.assert_allclose(result, [0, 0.08, 0.23, 0.02, 0.13, np.nan, 0.10], equal_nan=True)
+        with self.assertRaises(ValueError):
+            universe.dividend_yield(np.full(6, 100.))
+        with self.assertRaises(ValueError):
+            universe.dividend_yield(np.zeros(7))
+
+        # Stocks that StockData.dividend_yield rejects give NaN
+        universe = StockUniverse.from_rows([("BAD", "OTHER", 1.0, None, 100.0), ("P", StockType.PREFERRED, None, 0.02, None),
+                                            ("POP", StockType.COMMON, 8.0, None, 100.0)])
+        np.testing.assert_allclose(universe.dividend_yield(np.full(3, 100.)), [np.nan, np.nan, 0.08], equal_nan=True)
 
     def test_dividend_yield_preferred_stock(self):
         # Test dividend yield for preferred stocks with fixed dividend
@@ -38,6 +96,22 @@ class TestStockData(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.preferred_stock_no_dividend.dividend_yield(100)  # XYZ
 
+    def test_dividend_fields_rebind(self):
+        # Reassigning a dividend input updates the precomputed dividend functions
+        self.stock.last_dividend = 5.0
+        self.assertAlmostEqual(self.stock.dividend_yield(10), 0.5)
+        self.assertEqual(self.stock.pe_ratio(10), 20)
+        self.stock.last_dividend = None
+        with self.assertRaises(ValueError):
+            self.stock.dividend_yield(10)
+
+        # A preferred stock without a par value is constructible and only fails when used
+        stock = StockData("P", StockType.PREFERRED, None, 0.02, None)
+        with self.assertRaises(ValueError):
+            stock.dividend_yield(10)
+        stock.par_value = 100.0
+        self.assertAlmostEqual(stock.dividend_yield(10), 0.2)
+
     def test_invalid_inputs(self):
         # Test invalid inputs
         with self.assertRaises(ValueError):
@@ -48,24 +122,32 @@ class TestStockData(unittest.TestCase):
             self.preferred_stock_no_dividend.dividend_yield(100)
 
     def test_pe_ratio(self):
-        # Test P/E ratio calculation
-        
         # Test P/E ratio calculation for stock with zero dividend
         self.assertIsNone(self.tea_stock.pe_ratio(100))  # TEA
 
-        # Test P/E ratio calculation for pop_stock (Common, dividend = 8)
-        self.assertEqual(self.pop_stock.pe_ratio(100), 1250)  # P/E ratio = Price / Dividend
-
-        # Test P/E ratio calculation for ale_stock (Common, dividend = 23)
-        self.assertAlmostEqual(self.ale_stock.pe_ratio(100), (100 / 0.23))  # P/E ratio = Price / Dividend
-
-        # Test P/E ratio calculation for gin_stock 
-        self.assertEqual(self.gin_stock.pe_ratio(100), (100/0.02))  # P/E ratio = Price / Dividend
+        # Test P/E ratio calculation for stocks with a dividend, in one exact comparison
+        actual = np.array([stock.pe_ratio(price) for stock, price, _ in self.PE_RATIO_CASES])
+        expected = np.array([expected for _, _, expected in self.PE_RATIO_CASES])
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=0)
 
         # Test P/E ratio calculation for preferred_stock_no_dividend (Preferred, dividend = None)
         with self.assertRaises(ValueError):
            self.preferred_stock_no_dividend.pe_ratio(100)
 
+    def test_pe_ratio_batch(self):
+        # Test P/E ratio over an array of prices; NaN where the dividend is zero
+        prices = np.array([100.0, 50.0])
+        stocks = (self.tea_stock, self.pop_stock, self.ale_stock, self.gin_stock)
+        actual = np.concatenate([stock.pe_ratio_batch(prices) for stock in stocks])
+        expected = np.array([np.nan, np.nan, 1250, 312.5, 100 / 0.23, 50 / 0.46, 5000, 1250])
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, equal_nan=True)
+        with self.assertRaises(ValueError):
+            self.preferred_stock_no_dividend.pe_ratio_batch(prices)
+
+    def test_memory_footprint(self):
+        # StockData instances use slots rather than a per-instance __dict__
+        self.assertFalse(hasattr(self.stock, '__dict__'))
+
     def test_trading(self):
         # Test various trading scenarios
         initial_trades_count = len(self.stock.trades)
@@ -78,7 +160,8 @@ class TestStockData(unittest.TestCase):
         self.assertEqual(last_trade['price'], 50.0)
         self.assertEqual(last_trade['indicator'], TradeType.BUY)
         # Ensure the timestamp is recent (within a second)
-        self.assertAlmostEqual((datetime.now() - last_trade['timestamp']).total_seconds(), 0, delta=1)
+        self.assertLess(time.monotonic_ns() - last_trade.ts_ns, 1_000_000_000)
+        self.assertIsInstance(last_trade['timestamp'], datetime)
 
         # Record a valid sell trade
         self.stock.record_trade(50, 60.0, TradeType.SELL)
@@ -88,6 +171,12 @@ class TestStockData(unittest.TestCase):
         self.assertEqual(last_trade['price'], 60.0)
         self.assertEqual(last_trade['indicator'], TradeType.SELL)
 
+        # Slices of the trades view return lists of trades, with float quantities
+        trades = self.stock.trades[-2:]
+        self.assertEqual([trade['price'] for trade in trades], [50.0, 60.0])
+        self.assertIsInstance(trades[0]['quantity'], float)
+        self.assertEqual(self.stock.trades[::-1][0]['price'], 60.0)
+
         # Test recording a trade with zero quantity
         with self.assertRaises(ValueError):
             self.stock.record_trade(0, 50.0, TradeType.BUY)
@@ -107,22 +196,187 @@ class TestStockData(unittest.TestCase):
         # Test recording a trade with an invalid indicator
         with self.assertRaises(ValueError):
             self.stock.record_trade(100, 50.0, "INVALID")
+        with self.assertRaises(ValueError):
+            self.stock.record_trade(100, 50.0, [])
+
+    def test_record_trade_rejects_non_finite_values(self):
+        # NaN or inf would make the running VWAP totals NaN until the window empties
+        for quantity, price in ((100, float('nan')), (100, float('inf')), (float('nan'), 50.0), (float('inf'), 50.0)):
+            with self.subTest(quantity=quantity, price=price):
+                with self.assertRaises(ValueError):
+                    self.stock.record_trade(quantity, price, TradeType.BUY)
+                with self.assertRaises(ValueError):
+                    self.stock.record_trades(np.array([time.monotonic_ns()]), np.array([quantity]), np.array([price]),
+                                             np.array([0], dtype=np.int8))
+        self.assertEqual(len(self.stock.trades), 0)
+
+        self.stock.record_trade(100, 20.0, TradeType.BUY)
+        self.assertEqual(self.stock.volume_weighted_stock_price(), 20.0)
+
+    @unittest.skipUnless(_PERF_TESTS, "set STOCK_PERF_TESTS=1 to run timing tests")
+    def test_record_trade_perf(self):
+        # Soft regression gate on the cost of recording a trade
+        start = time.perf_counter_ns()
+        for _ in range(10_000):
+            self.stock.record_trade(1, 1.0, TradeType.BUY)
+        self.assertLess(time.perf_counter_ns() - start, 250_000_000)
+
+    @unittest.skipUnless(_PERF_TESTS, "set STOCK_PERF_TESTS=1 to run timing tests")
+    def test_vwap_query_perf(self):
+        # Queries read the running totals, independent of how many trades were recorded
+        now = time.monotonic_ns()
+        count = 10**5
+        self.stock.record_trades(np.arange(now - count, now), np.ones(count), np.ones(count), np.zeros(count, dtype=np.int8))
+        self.assertLess(timeit.timeit(self.stock.volume_weighted_stock_price, number=10_000), 1.0)
 
     def test_volume_weighted_stock_price_with_trades(self):
         # Test with trades within the last 15 minutes
-        now = datetime.now()
-        fifteen_minutes_ago = now - timedelta(minutes=15)
+        now = time.monotonic_ns()
+        fourteen_minutes_ago = now - 14 * 60 * 10**9
 
-        # Create trades within the last 15 minutes
-        self.stock.trades = [
-            {'timestamp': now, 'quantity': 100, 'price': 50.0},
-            {'timestamp': fifteen_minutes_ago, 'quantity': 200, 'price': 60.0}
-        ]
+        # Create trades within the last 15 minutes, replacing any recorded ones
+        self.stock.record_trade(10, 99.0, TradeType.BUY)
+        self.stock.set_trades_bulk(
+            np.array([fourteen_minutes_ago, now]),
+            np.array([200.0, 100.0]),
+            np.array([60.0, 50.0]),
+            np.array([1, 0], dtype=np.int8),
+        )
+        self.assertEqual(len(self.stock.trades), 2)
 
         # Calculate volume-weighted stock price
         expected_price = (100 * 50.0 + 200 * 60.0) / (100 + 200)
         self.assertAlmostEqual(self.stock.volume_weighted_stock_price(), expected_price)
 
+    def test_volume_weighted_stock_price_excludes_old_trades(self):
+        # Trades older than 15 minutes should not contribute to the price
+        now = time.monotonic_ns()
+        sixteen_minutes_ago = now - 16 * 60 * 10**9
+        self.stock.set_trades_bulk(
+            np.array([sixteen_minutes_ago, now]),
+            np.array([200.0, 100.0]),
+            np.array([60.0, 50.0]),
+            np.array([1, 0], dtype=np.int8),
+        )
+
+        self.assertAlmostEqual(self.stock.volume_weighted_stock_price(), 50.0)
+
+    def test_record_trades(self):
+        # Record a batch of trades, the oldest of which is outside the 15-minute window
+        now = time.monotonic_ns()
+        timestamps = np.array([now - 16 * 60 * 10**9, now - 60 * 10**9, now])
+        quantities = np.array([300.0, 200.0, 100.0])
+        prices = np.array([10.0, 60.0, 50.0])
+        sides = np.array([0, 1, 0], dtype=np.int8)
+        self.stock.set_trades_bulk(np.array([now - 20 * 60 * 10**9]), np.array([400.0]), np.array([70.0]),
+                                   np.array([0], dtype=np.int8))
+        self.stock.record_trades(timestamps, quantities, prices, sides)
+
+        self.assertEqual(len(self.stock.trades), 4)
+        self.assertEqual(self.stock.trades[-1]['price'], 50.0)
+        self.assertEqual(self.stock.trades[2]['indicator'], TradeType.SELL)
+        self.assertEqual(self.stock.last_price, 50.0)
+        self.assertAlmostEqual(self.stock.volume_weighted_stock_price(), (200 * 60.0 + 100 * 50.0) / (200 + 100))
+
+        # Appending to a non-empty window adds only the new trades
+        self.stock.record_trades(np.array([now + 1]), np.array([300.0]), np.array([40.0]), np.array([1], dtype=np.int8))
+        self.assertAlmostEqual(self.stock.volume_weighted_stock_price(), (200 * 60.0 + 100 * 50.0 + 300 * 40.0) / 600)
+
+        # Invalid batches are rejected
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([now, now + 2]), np.array([1.0]), np.array([1.0]), np.array([0]))
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([now]), np.array([1.0]), np.array([1.0]), np.array([0]))
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([now + 2]), np.array([0.0]), np.array([1.0]), np.array([0]))
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([now + 2]), np.array([1.0]), np.array([-1.0]), np.array([0]))
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([now + 2]), np.array([1.0]), np.array([1.0]), np.array([2]))
+
+    def test_record_trades_rejects_future_timestamps(self):
+        # A future batch trade would leave later record_trade calls out of time order
+        future = time.monotonic_ns() + 60 * 60 * 10**9
+        with self.assertRaises(ValueError):
+            self.stock.record_trades(np.array([future]), np.array([10.0]), np.array([10.0]), np.array([0], dtype=np.int8))
+        self.assertEqual(len(self.stock.trades), 0)
+
+        self.stock.record_trade(100, 500.0, TradeType.BUY)
+        self.assertEqual(self.stock.volume_weighted_stock_price(), 500.0)
+
+    def test_record_trades_rejects_malformed_arrays(self):
+        # The inputs are checked before any cast, so bad values cannot wrap or truncate into valid ones
+        now = time.monotonic_ns()
+        one = np.array([1.0])
+        cases = (
+            (np.array([now]), one, one, np.array([256])),
+            (np.array([now]), one, one, [300]),
+            (np.array([now]), one, one, np.array([0.0])),
+            (np.array([now], dtype=np.float64), one, one, np.array([0])),
+            (np.int64(now), np.float64(1.0), np.float64(1.0), np.int8(0)),
+            (np.array([[now]]), np.array([[1.0]]), np.array([[1.0]]), np.array([[0]])),
+        )
+        for timestamps, quantities, prices, sides in cases:
+            with self.subTest(timestamps=timestamps, sides=sides):
+                with self.assertRaises(ValueError):
+                    self.stock.record_trades(timestamps, quantities, prices, sides)
+        self.assertEqual(len(self.stock.trades), 0)
+
+        # Plain integer lists are accepted
+        self.stock.record_trades([now], [10], [20.0], [1])
+        self.assertEqual(self.stock.trades[0]['indicator'], TradeType.SELL)
+
+    def test_vwap_kernel_matches_reference(self):
+        # Load 10^4 synthetic trades, half of them older than the 15-minute window, and
+        # compare against a NumPy reference computed over the trades inside the window
+        rng = np.random.default_rng(0)
+        count = 10**4
+        now = time.monotonic_ns()
+        minute = 60 * 10**9
+        old = now - rng.integers(16 * minute, 30 * minute, count // 2)
+        recent = now - rng.integers(0, 14 * minute, count // 2)
+        timestamps = np.sort(np.concatenate([old, recent]))
+        quantities = rng.integers(1, 1000, count).astype(np.float64)
+        prices = rng.uniform(1.0, 500.0, count)
+        sides = rng.integers(0, 2, count).astype(np.int8)
+        self.stock.set_trades_bulk(timestamps, quantities, prices, sides)
+
+        in_window = timestamps >= now - 15 * minute
+        reference = np.dot(prices[in_window], quantities[in_window]) / quantities[in_window].sum()
+        self.assertTrue(np.isclose(self.stock.volume_weighted_stock_price(), reference, rtol=1e-12, atol=0))
+
+    def test_vwap_sliding_eviction(self):
+        # Replay 10^5 trades over the last hour in chunks; trades that leave the 15-minute
+        # window are discarded, so the buffer stays sized to the window
+        rng = np.random.default_rng(1)
+        count = 10**5
+        now = time.monotonic_ns()
+        minute = 60 * 10**9
+        old = np.linspace(now - 60 * minute, now - 16 * minute, count * 3 // 4).astype(np.int64)
+        recent = np.linspace(now - 14 * minute, now, count // 4).astype(np.int64)
+        timestamps = np.concatenate([old, recent])
+        quantities = rng.integers(1, 1000, count).astype(np.float64)
+        prices = rng.uniform(1.0, 500.0, count)
+        sides = rng.integers(0, 2, count).astype(np.int8)
+        for chunk in np.array_split(np.arange(count), 100):
+            self.stock.record_trades(timestamps[chunk], quantities[chunk], prices[chunk], sides[chunk])
+
+        self.assertLess(self.stock._ts.size, count)
+        self.assertLess(len(self.stock.trades), count)
+
+        in_window = timestamps >= now - 15 * minute
+        reference = np.dot(prices[in_window], quantities[in_window]) / quantities[in_window].sum()
+        self.assertTrue(np.isclose(self.stock.volume_weighted_stock_price(), reference, rtol=1e-9, atol=0))
+
+    def test_vwap_precision_after_large_trade_expires(self):
+        # Subtracting a huge expired trade from the running totals would cancel the small ones away
+        now = time.monotonic_ns()
+        self.stock.record_trades(np.array([now - 2_000_000, now - 1_000_000, now]), np.array([1e12, 3.0, 7.0]),
+                                 np.array([1e6, 10.1, 10.3]), np.array([0, 1, 0]))
+        self.stock._evict(now - 1_500_000)
+        self.assertEqual(len(self.stock.trades), 3)
+        self.assertAlmostEqual(self.stock.volume_weighted_stock_price(), 10.24, places=12)
+
     def test_volume_weighted_stock_price_no_trades(self):
         # Test with no trades available
         self.assertIsNone(self.stock.volume_weighted_stock_price())
@@ -138,6 +392,26 @@ class TestStockData(unittest.TestCase):
        self.assertAlmostEqual(self.tea_stock.volume_weighted_stock_price(), 103.333, places=3) # ((10*100) + (5*110)) / (10 + 5)
        self.assertAlmostEqual(self.gin_stock.volume_weighted_stock_price(), 123.333, places=3)  # ((5*120) + (10*125)) / (5 + 10)
 
+    def test_gbce_all_share_index(self):
+        # Stocks without trades are ignored
+        self.assertIsNone(GBCECalculator.calculate_gbce_all_share_index([]))
+        self.assertIsNone(GBCECalculator.calculate_gbce_all_share_index([self.tea_stock]))
+
+        self.tea_stock.record_trade(10, 100.0, TradeType.BUY)
+        self.gin_stock.record_trade(5, 400.0, TradeType.SELL)
+        stocks = [self.tea_stock, self.pop_stock, self.gin_stock]
+        self.assertAlmostEqual(GBCECalculator.calculate_gbce_all_share_index(stocks), 200.0)  # sqrt(100 * 400)
+
+    def test_gbce_all_share_index_many_stocks(self):
+        # The product of 400 prices of 100 overflows a float, the geometric mean should not
+        stocks = [StockData(f"S{i}", StockType.COMMON, 1.0, None, 100.0) for i in range(400)]
+        for stock in stocks:
+            stock.record_trade(1, 100.0, TradeType.BUY)
+        self.assertAlmostEqual(GBCECalculator.calculate_gbce_all_share_index(stocks), 100.0)
+
+    def test_gbce_all_share_index_batch(self):
+        last_prices = np.array([100.0, np.nan, 400.0])
+        valid_mask = np.array([True, False, True])
+        self.assertAlmostEqual(GBCECalculator.calculate_gbce_all_share_index_batch(last_prices, valid_mask), 200.0)
+        self.assertIsNone(GBCECalculator.calculate_gbce_all_share_index_batch(last_prices, np.zeros(3, dtype=bool)))
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file